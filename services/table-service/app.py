@@ -1,28 +1,42 @@
 #!/usr/bin/env python3
 import asyncio
+import concurrent.futures
+import contextlib
+import functools
 import hashlib
 import json
+import logging
+import multiprocessing
 import os
 import sqlite3
 import threading
 import time
-from datetime import datetime, timezone
+import uuid
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, Iterator, List, Optional
 
-from fastapi import FastAPI, Header, HTTPException
+import orjson
+from fastapi import FastAPI, Header, HTTPException, Response
 from pydantic import BaseModel, Field
 
+from extraction import OUTPUT_DIR, _PDFPLUMBER_IMPORT_ERROR, run_table_extraction, to_utc_iso, utc_now_iso
+
+
+logger = logging.getLogger("table_service")
 
 QUEUE_DB_PATH = os.getenv("ASYNC_QUEUE_PATH", "data/async-queue.sqlite")
-OUTPUT_DIR = os.getenv("OUTPUT_EXTRACTED_DIR", "data/extracted")
 SERVICE_TOKEN = os.getenv("TABLE_SERVICE_TOKEN")
 WORKER_ENABLED = os.getenv("TABLE_SERVICE_ENABLE_WORKER", "1").lower() in {"1", "true", "yes"}
 WORKER_CONCURRENCY = max(1, int(os.getenv("TABLE_WORKER_CONCURRENCY", "2")))
 WORKER_BATCH = max(1, int(os.getenv("TABLE_WORKER_MAX_BATCH", "5")))
 WORKER_POLL_MS = max(100, int(os.getenv("TABLE_WORKER_POLL_INTERVAL_MS", "1000")))
 LEASE_SECONDS = max(30, int(os.getenv("TABLE_WORKER_LEASE_SECONDS", "120")))
-ENABLE_OCR_FALLBACK = os.getenv("TABLE_WORKER_ENABLE_OCR_FALLBACK", "0").lower() in {"1", "true", "yes"}
+# Stay well under SQLite's default SQLITE_MAX_VARIABLE_NUMBER (999 on older builds).
+SQLITE_MAX_IN_PARAMS = 500
+# Each published row binds three parameters (id, payload, createdAt).
+PUBLISH_ROWS_PER_INSERT = 999 // 3
+PUBLISH_ROW_VALUES = "(?, ?, 'pending', ?, NULL)"
 
 
 class QueueEnvelope(BaseModel):
@@ -46,22 +60,42 @@ class LeaseResponse(BaseModel):
   messages: List[QueueEnvelope] = Field(default_factory=list)
 
 
-def utc_now_iso() -> str:
-  return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
-
-
 def ensure_pdfplumber_available() -> None:
-  try:
-    import pdfplumber  # noqa: F401
-  except Exception as exc:  # pragma: no cover - startup guard
+  if _PDFPLUMBER_IMPORT_ERROR is not None:  # pragma: no cover - startup guard
     raise RuntimeError(
       "pdfplumber is required for table worker. Install with: pip install -r services/table-service/requirements.txt"
-    ) from exc
+    ) from _PDFPLUMBER_IMPORT_ERROR
+
+
+def compute_queue_message_id(table_name: str, payload: Dict[str, Any]) -> str:
+  job_id = payload.get("jobId")
+  if table_name != "queue_requests" or not job_id:
+    # Results are never deduplicated: every attempt's result has to reach the orchestrator.
+    return uuid.uuid4().hex[:24]
+  return request_message_id_for(str(job_id), str(payload.get("runId", "")), str(payload.get("attempt", "")))
 
 
-def compute_queue_message_id(payload: Dict[str, Any]) -> str:
-  material = f"{payload.get('jobId', '')}|{payload.get('docId', '')}|{utc_now_iso()}".encode("utf-8")
-  return hashlib.sha256(material).hexdigest()[:24]
+@functools.lru_cache(maxsize=4096)
+def request_message_id_for(job_id: str, run_id: str, attempt: str) -> str:
+  # Deterministic so re-publishing the same attempt is a no-op while it is still queued; a retry is a new attempt.
+  return hashlib.blake2b(f"{job_id}|{run_id}|{attempt}".encode("utf-8"), digest_size=12).hexdigest()
+
+
+def encode_payload(payload: Dict[str, Any]) -> str:
+  try:
+    return orjson.dumps(payload).decode("utf-8")
+  except TypeError:
+    # orjson only encodes 64-bit integers; the stdlib encoder handles arbitrary precision.
+    return json.dumps(payload, separators=(",", ":"))
+
+
+def lease_response(messages: List[Dict[str, Any]]) -> Response:
+  # Payloads are already JSON text in the queue, so splice them in instead of decoding and re-encoding.
+  envelopes = b",".join(
+    b'{"queueMessageId":' + orjson.dumps(message["queueMessageId"]) + b',"payload":' + message["payload"].encode("utf-8") + b"}"
+    for message in messages
+  )
+  return Response(content=b'{"messages":[' + envelopes + b"]}", media_type="application/json")
 
 
 def require_token(authorization: Optional[str]) -> None:
@@ -72,49 +106,134 @@ def require_token(authorization: Optional[str]) -> None:
     raise HTTPException(status_code=401, detail="unauthorized")
 
 
+QUEUE_TABLES = ("queue_requests", "queue_results")
+
+
+def build_queue_sql(table_name: str) -> Dict[str, str]:
+  return {
+    "reset_stale": f"""
+      UPDATE {table_name}
+      SET status='pending', leaseUntil=NULL
+      WHERE status='leased' AND leaseUntil IS NOT NULL AND leaseUntil < ?
+    """,
+    "lease": f"""
+      UPDATE {table_name}
+      SET status='leased', leaseUntil=?
+      WHERE queueMessageId IN (
+        SELECT queueMessageId
+        FROM {table_name}
+        WHERE status='pending'
+        ORDER BY createdAt ASC
+        LIMIT ?
+      )
+      RETURNING queueMessageId, payload, createdAt
+    """,
+  }
+
+
+# Batch statements depend on the row count, so their text is cached per (table, count) rather than rebuilt per call.
+@functools.lru_cache(maxsize=256)
+def build_publish_sql(table_name: str, row_count: int) -> str:
+  if table_name not in QUEUE_TABLES:
+    raise KeyError(table_name)
+  values = ", ".join([PUBLISH_ROW_VALUES] * row_count)
+  return f"INSERT OR IGNORE INTO {table_name}(queueMessageId, payload, status, createdAt, leaseUntil) VALUES {values}"
+
+
+@functools.lru_cache(maxsize=256)
+def build_ack_sql(table_name: str, id_count: int) -> str:
+  if table_name not in QUEUE_TABLES:
+    raise KeyError(table_name)
+  return f"DELETE FROM {table_name} WHERE queueMessageId IN ({','.join('?' * id_count)})"
+
+
 class SqliteQueueStore:
   def __init__(self, db_path: str):
     self.db_path = db_path
-    self.lock = threading.Lock()
+    # Statement text is fixed per table so sqlite3's statement cache can reuse the prepared statements.
+    self._sql = {table_name: build_queue_sql(table_name) for table_name in QUEUE_TABLES}
+    self._tls = threading.local()
+    self._connections: List[sqlite3.Connection] = []
+    self._connections_lock = threading.Lock()
+    self._publish_listeners: List[Callable[[str], None]] = []
     Path(db_path).parent.mkdir(parents=True, exist_ok=True)
     self._initialize_schema()
 
   def _connect(self) -> sqlite3.Connection:
-    conn = sqlite3.connect(self.db_path)
+    # One connection per thread, opened lazily and reused for every call made on that thread.
+    conn = getattr(self._tls, "conn", None)
+    if conn is not None:
+      return conn
+
+    # Autocommit mode: write paths open their own BEGIN IMMEDIATE transactions via _transaction().
+    conn = sqlite3.connect(self.db_path, isolation_level=None, check_same_thread=False)
     conn.row_factory = sqlite3.Row
+    # WAL lets the HTTP handlers read while the worker writes; NORMAL sync is durable enough under WAL.
+    conn.executescript(
+      """
+      PRAGMA journal_mode=WAL;
+      PRAGMA synchronous=NORMAL;
+      PRAGMA busy_timeout=5000;
+      PRAGMA temp_store=MEMORY;
+      PRAGMA mmap_size=268435456;
+      """
+    )
+    self._tls.conn = conn
+    with self._connections_lock:
+      self._connections.append(conn)
     return conn
 
+  def close(self) -> None:
+    with self._connections_lock:
+      connections, self._connections = self._connections, []
+    for conn in connections:
+      conn.close()
+    self._tls = threading.local()
+
+  @contextlib.contextmanager
+  def _transaction(self, conn: sqlite3.Connection) -> Iterator[None]:
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+      yield
+      conn.execute("COMMIT")
+    except BaseException:
+      # A failed COMMIT (e.g. SQLITE_BUSY) can leave the transaction open; SQLite may also have rolled back already.
+      if conn.in_transaction:
+        conn.execute("ROLLBACK")
+      raise
+
   def _initialize_schema(self) -> None:
-    with self.lock:
-      conn = self._connect()
-      try:
-        conn.executescript(
-          """
-          CREATE TABLE IF NOT EXISTS queue_requests (
-            queueMessageId TEXT PRIMARY KEY,
-            payload TEXT NOT NULL,
-            status TEXT NOT NULL,
-            createdAt TEXT NOT NULL,
-            leaseUntil TEXT NULL
-          );
-
-          CREATE TABLE IF NOT EXISTS queue_results (
-            queueMessageId TEXT PRIMARY KEY,
-            payload TEXT NOT NULL,
-            status TEXT NOT NULL,
-            createdAt TEXT NOT NULL,
-            leaseUntil TEXT NULL
-          );
-
-          CREATE INDEX IF NOT EXISTS idx_queue_requests_status ON queue_requests(status, createdAt);
-          CREATE INDEX IF NOT EXISTS idx_queue_results_status ON queue_results(status, createdAt);
-          """
-        )
-        self._ensure_column(conn, "queue_requests", "leaseUntil", "TEXT NULL")
-        self._ensure_column(conn, "queue_results", "leaseUntil", "TEXT NULL")
-        conn.commit()
-      finally:
-        conn.close()
+    conn = self._connect()
+    conn.executescript(
+      """
+      CREATE TABLE IF NOT EXISTS queue_requests (
+        queueMessageId TEXT PRIMARY KEY,
+        payload TEXT NOT NULL,
+        status TEXT NOT NULL,
+        createdAt TEXT NOT NULL,
+        leaseUntil TEXT NULL
+      );
+
+      CREATE TABLE IF NOT EXISTS queue_results (
+        queueMessageId TEXT PRIMARY KEY,
+        payload TEXT NOT NULL,
+        status TEXT NOT NULL,
+        createdAt TEXT NOT NULL,
+        leaseUntil TEXT NULL
+      );
+
+      -- Partial indexes stay small because they only cover rows the lease path scans;
+      -- they replace the earlier status indexes. Keep in sync with src/extract/localSqliteQueueAdapter.ts.
+      DROP INDEX IF EXISTS idx_queue_requests_status;
+      DROP INDEX IF EXISTS idx_queue_results_status;
+      CREATE INDEX IF NOT EXISTS idx_queue_requests_pending ON queue_requests(createdAt) WHERE status='pending';
+      CREATE INDEX IF NOT EXISTS idx_queue_results_pending ON queue_results(createdAt) WHERE status='pending';
+      CREATE INDEX IF NOT EXISTS idx_queue_requests_leased ON queue_requests(leaseUntil) WHERE status='leased';
+      CREATE INDEX IF NOT EXISTS idx_queue_results_leased ON queue_results(leaseUntil) WHERE status='leased';
+      """
+    )
+    self._ensure_column(conn, "queue_requests", "leaseUntil", "TEXT NULL")
+    self._ensure_column(conn, "queue_results", "leaseUntil", "TEXT NULL")
 
   def _ensure_column(self, conn: sqlite3.Connection, table_name: str, column_name: str, column_ddl: str) -> None:
     columns = conn.execute(f"PRAGMA table_info({table_name})").fetchall()
@@ -122,216 +241,74 @@ class SqliteQueueStore:
     if column_name not in column_names:
       conn.execute(f"ALTER TABLE {table_name} ADD COLUMN {column_name} {column_ddl}")
 
+  def add_publish_listener(self, listener: Callable[[str], None]) -> None:
+    self._publish_listeners.append(listener)
+
+  def remove_publish_listener(self, listener: Callable[[str], None]) -> None:
+    self._publish_listeners.remove(listener)
+
   def publish(self, table_name: str, payloads: List[Dict[str, Any]]) -> int:
     if not payloads:
       return 0
 
     now = utc_now_iso()
-    with self.lock:
-      conn = self._connect()
-      try:
-        for payload in payloads:
-          conn.execute(
-            f"""
-            INSERT INTO {table_name}(queueMessageId, payload, status, createdAt, leaseUntil)
-            VALUES (?, ?, 'pending', ?, NULL)
-            """,
-            (compute_queue_message_id(payload), json.dumps(payload), now),
-          )
-        conn.commit()
-      finally:
-        conn.close()
-    return len(payloads)
-
-  def lease(self, table_name: str, limit: int, lease_seconds: int) -> List[Dict[str, Any]]:
+    params: List[str] = []
+    for payload in payloads:
+      params.extend((compute_queue_message_id(table_name, payload), encode_payload(payload), now))
+    conn = self._connect()
+    changes_before = conn.total_changes
+    # One transaction for the whole batch, and one multi-row INSERT per chunk of rows.
+    # Duplicate ids are skipped by INSERT OR IGNORE rather than failing the whole batch.
+    with self._transaction(conn):
+      for start in range(0, len(payloads), PUBLISH_ROWS_PER_INSERT):
+        chunk = params[start * 3:(start + PUBLISH_ROWS_PER_INSERT) * 3]
+        conn.execute(build_publish_sql(table_name, len(chunk) // 3), chunk)
+    inserted = conn.total_changes - changes_before
+    if inserted:
+      # Listeners run after commit, on the publishing thread.
+      for listener in list(self._publish_listeners):
+        listener(table_name)
+    return inserted
+
+  def lease(self, table_name: str, limit: int, lease_seconds: int, raw: bool = False) -> List[Dict[str, Any]]:
     if limit <= 0:
       return []
 
-    now = utc_now_iso()
-    lease_until_ts = datetime.now(timezone.utc).timestamp() + lease_seconds
-    lease_until = datetime.fromtimestamp(lease_until_ts, timezone.utc).isoformat().replace("+00:00", "Z")
-
-    with self.lock:
-      conn = self._connect()
-      try:
-        conn.execute(
-          f"""
-          UPDATE {table_name}
-          SET status='pending', leaseUntil=NULL
-          WHERE status='leased' AND leaseUntil IS NOT NULL AND leaseUntil < ?
-          """,
-          (now,),
-        )
-        rows = conn.execute(
-          f"""
-          SELECT queueMessageId, payload
-          FROM {table_name}
-          WHERE status='pending'
-          ORDER BY createdAt ASC
-          LIMIT ?
-          """,
-          (limit,),
-        ).fetchall()
-
-        if not rows:
-          conn.commit()
-          return []
-
-        queue_ids = [row["queueMessageId"] for row in rows]
-        conn.executemany(
-          f"UPDATE {table_name} SET status='leased', leaseUntil=? WHERE queueMessageId=?",
-          [(lease_until, queue_id) for queue_id in queue_ids],
-        )
-        conn.commit()
-
-        envelopes = []
-        for row in rows:
-          envelopes.append(
-            {
-              "queueMessageId": row["queueMessageId"],
-              "payload": json.loads(row["payload"]),
-            }
-          )
-        return envelopes
-      finally:
-        conn.close()
+    now_dt = datetime.now(timezone.utc)
+    now = to_utc_iso(now_dt)
+    lease_until = to_utc_iso(now_dt + timedelta(seconds=lease_seconds))
+
+    sql = self._sql[table_name]
+    conn = self._connect()
+    # The write lock is taken up front so the stale-lease reset and the lease itself are atomic.
+    with self._transaction(conn):
+      conn.execute(sql["reset_stale"], (now,))
+      rows = conn.execute(sql["lease"], (lease_until, limit)).fetchall()
+
+    # RETURNING does not preserve the subquery order.
+    rows.sort(key=lambda row: row["createdAt"])
+    envelopes = []
+    for row in rows:
+      envelopes.append(
+        {
+          "queueMessageId": row["queueMessageId"],
+          "payload": row["payload"] if raw else orjson.loads(row["payload"]),
+        }
+      )
+    return envelopes
 
   def ack(self, table_name: str, queue_ids: List[str]) -> int:
     if not queue_ids:
       return 0
 
-    with self.lock:
-      conn = self._connect()
-      try:
-        conn.executemany(
-          f"DELETE FROM {table_name} WHERE queueMessageId=?",
-          [(queue_id,) for queue_id in queue_ids],
-        )
-        conn.commit()
-      finally:
-        conn.close()
+    conn = self._connect()
+    with self._transaction(conn):
+      for start in range(0, len(queue_ids), SQLITE_MAX_IN_PARAMS):
+        chunk = queue_ids[start:start + SQLITE_MAX_IN_PARAMS]
+        conn.execute(build_ack_sql(table_name, len(chunk)), chunk)
     return len(queue_ids)
 
 
-def run_table_extraction(doc_id: str, raw_pdf_path: str) -> Dict[str, Any]:
-  if not raw_pdf_path or not Path(raw_pdf_path).exists():
-    return {
-      "status": "failed",
-      "errorCode": "file_not_found",
-      "error": f"raw pdf not found: {raw_pdf_path}",
-      "tableCount": 0,
-      "tablesLocation": None,
-      "engine": "pdfplumber",
-    }
-
-  try:
-    import pdfplumber  # type: ignore
-  except Exception:
-    return {
-      "status": "failed",
-      "errorCode": "dependency_missing",
-      "error": "pdfplumber_not_installed",
-      "tableCount": 0,
-      "tablesLocation": None,
-      "engine": "pdfplumber",
-    }
-
-  output_path = str(Path(OUTPUT_DIR) / f"{doc_id}.tables.json")
-  pages_payload: List[Dict[str, Any]] = []
-  table_count = 0
-
-  try:
-    with pdfplumber.open(raw_pdf_path) as pdf:
-      for page_index, page in enumerate(pdf.pages, start=1):
-        tables = extract_tables_with_strategies(page)
-        normalized = []
-        for table_index, rows in enumerate(tables):
-          normalized.append(
-            {
-              "index": table_index,
-              "rowCount": len(rows),
-              "rows": rows,
-            }
-          )
-        table_count += len(tables)
-        pages_payload.append(
-          {
-            "pageNumber": page_index,
-            "tableCount": len(tables),
-                "tables": normalized,
-              }
-            )
-
-      if table_count == 0 and ENABLE_OCR_FALLBACK:
-        # Placeholder for future OCR table extraction path.
-        # Keep explicit marker for observability when OCR fallback is requested.
-        return {
-          "status": "no_tables",
-          "errorCode": "unknown",
-          "error": "ocr_fallback_requested_but_not_implemented",
-          "tableCount": 0,
-          "tablesLocation": None,
-          "engine": "pdfplumber",
-        }
-
-    payload = {
-      "docId": doc_id,
-      "status": "ok",
-      "tableCount": table_count,
-      "pageCount": len(pages_payload),
-      "pages": pages_payload,
-      "engine": "pdfplumber",
-      "extractedAt": utc_now_iso(),
-    }
-    Path(output_path).parent.mkdir(parents=True, exist_ok=True)
-    Path(output_path).write_text(json.dumps(payload, indent=2), encoding="utf-8")
-    return {
-      "status": "ok" if table_count > 0 else "no_tables",
-      "errorCode": None,
-      "error": None,
-      "tableCount": table_count,
-      "tablesLocation": output_path,
-      "engine": "pdfplumber",
-    }
-  except PermissionError as exc:
-    return {
-      "status": "failed",
-      "errorCode": "file_access_denied",
-      "error": str(exc),
-      "tableCount": 0,
-      "tablesLocation": None,
-      "engine": "pdfplumber",
-    }
-  except Exception as exc:
-    return {
-      "status": "failed",
-      "errorCode": "parse_error",
-      "error": str(exc),
-      "tableCount": 0,
-      "tablesLocation": None,
-      "engine": "pdfplumber",
-    }
-
-
-def extract_tables_with_strategies(page: Any) -> List[Any]:
-  strategy_candidates = [
-    None,
-    {"vertical_strategy": "lines", "horizontal_strategy": "lines"},
-    {"vertical_strategy": "text", "horizontal_strategy": "text", "snap_tolerance": 3, "join_tolerance": 3, "intersection_tolerance": 3},
-  ]
-  merged: List[Any] = []
-  seen = set()
-  for strategy in strategy_candidates:
-    tables = page.extract_tables(strategy) if strategy is not None else page.extract_tables()
-    for table in tables or []:
-      signature = json.dumps(table, ensure_ascii=False)
-      if signature in seen:
-        continue
-      seen.add(signature)
-      merged.append(table)
-  return merged
-
-
 def build_result_message(request_payload: Dict[str, Any], extracted: Dict[str, Any], duration_ms: int) -> Dict[str, Any]:
   return {
     "version": "v1",
@@ -349,27 +326,79 @@ def build_result_message(request_payload: Dict[str, Any], extracted: Dict[str, A
   }
 
 
+def new_extraction_pool() -> concurrent.futures.ProcessPoolExecutor:
+  # Spawn rather than fork: forking the server would copy its event loop, threads and open SQLite
+  # connections into the children. Children only import the side-effect-free extraction module.
+  return concurrent.futures.ProcessPoolExecutor(
+    max_workers=WORKER_CONCURRENCY,
+    mp_context=multiprocessing.get_context("spawn"),
+  )
+
+
 class BackgroundWorker:
   def __init__(self, store: SqliteQueueStore):
     self.store = store
     self._task: Optional[asyncio.Task[Any]] = None
     self._stopped = asyncio.Event()
+    self._pending = asyncio.Event()
+    self._pool: Optional[concurrent.futures.ProcessPoolExecutor] = None
+    self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+  def _on_publish(self, table_name: str) -> None:
+    if table_name == "queue_requests" and self._loop is not None:
+      self._loop.call_soon_threadsafe(self._pending.set)
 
   async def start(self) -> None:
     self._stopped.clear()
+    self._loop = asyncio.get_running_loop()
+    self.store.add_publish_listener(self._on_publish)
+    # pdfplumber parsing is CPU-bound and holds the GIL, so extraction runs in worker processes.
+    self._pool = new_extraction_pool()
     self._task = asyncio.create_task(self._run_loop())
 
   async def stop(self) -> None:
+    self.store.remove_publish_listener(self._on_publish)
     self._stopped.set()
+    self._pending.set()
     if self._task:
       await self._task
+    if self._pool:
+      self._pool.shutdown(wait=True)
+      self._pool = None
+
+  async def _extract(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+    pool = self._pool
+    try:
+      return await asyncio.get_running_loop().run_in_executor(
+        pool,
+        run_table_extraction,
+        str(payload.get("docId", "unknown")),
+        str(payload.get("rawPdfPath", "")),
+      )
+    except concurrent.futures.process.BrokenProcessPool:
+      # A child died (OOM kill, native crash); every later submit would fail, so start a fresh pool.
+      if pool is not None and self._pool is pool:
+        pool.shutdown(wait=False, cancel_futures=True)
+        self._pool = new_extraction_pool()
+      raise
 
   async def _run_loop(self) -> None:
     semaphore = asyncio.Semaphore(WORKER_CONCURRENCY)
     while not self._stopped.is_set():
-      batch = await asyncio.to_thread(self.store.lease, "queue_requests", WORKER_BATCH, LEASE_SECONDS)
+      try:
+        batch = await asyncio.to_thread(self.store.lease, "queue_requests", WORKER_BATCH, LEASE_SECONDS)
+      except Exception:
+        logger.exception("table_worker_lease_failed")
+        batch = []
       if not batch:
-        await asyncio.sleep(WORKER_POLL_MS / 1000.0)
+        # Publishes through the store wake the loop immediately. The poll interval remains as a fallback
+        # for expired leases and for rows written to the database by other processes.
+        try:
+          await asyncio.wait_for(self._pending.wait(), WORKER_POLL_MS / 1000.0)
+        except asyncio.TimeoutError:
+          pass
+        finally:
+          self._pending.clear()
         continue
 
       async def process_one(message: Dict[str, Any]) -> None:
@@ -377,15 +406,26 @@ class BackgroundWorker:
           queue_id = message["queueMessageId"]
           payload = message["payload"]
           started = time.time()
-          extracted = await asyncio.to_thread(
-            run_table_extraction,
-            str(payload.get("docId", "unknown")),
-            str(payload.get("rawPdfPath", "")),
-          )
+          try:
+            extracted = await self._extract(payload)
+          except Exception as exc:
+            logger.exception("table_worker_extraction_failed", extra={"queueMessageId": queue_id})
+            extracted = {
+              "status": "failed",
+              "errorCode": "worker_exception",
+              "error": f"worker_exception: {exc}",
+              "tableCount": 0,
+              "tablesLocation": None,
+              "engine": "pdfplumber",
+            }
           duration_ms = int((time.time() - started) * 1000)
           result_payload = build_result_message(payload, extracted, duration_ms)
-          await asyncio.to_thread(self.store.publish, "queue_results", [result_payload])
-          await asyncio.to_thread(self.store.ack, "queue_requests", [queue_id])
+          try:
+            await asyncio.to_thread(self.store.publish, "queue_results", [result_payload])
+            await asyncio.to_thread(self.store.ack, "queue_requests", [queue_id])
+          except Exception:
+            # Left unacked: the lease expires and the request is retried.
+            logger.exception("table_worker_result_publish_failed", extra={"queueMessageId": queue_id})
 
       await asyncio.gather(*(process_one(item) for item in batch))
 
@@ -407,6 +447,7 @@ async def on_startup() -> None:
 async def on_shutdown() -> None:
   if WORKER_ENABLED:
     await worker.stop()
+  store.close()
 
 
 @app.get("/health")
@@ -429,10 +470,10 @@ async def publish_requests(req: PublishMessagesRequest, authorization: Optional[
 
 
 @app.post("/v1/queue/requests/lease", response_model=LeaseResponse)
-async def lease_requests(req: LeaseRequest, authorization: Optional[str] = Header(default=None)) -> LeaseResponse:
+async def lease_requests(req: LeaseRequest, authorization: Optional[str] = Header(default=None)) -> Response:
   require_token(authorization)
-  messages = await asyncio.to_thread(store.lease, "queue_requests", min(max(1, req.limit), 100), LEASE_SECONDS)
-  return LeaseResponse(messages=messages)
+  messages = await asyncio.to_thread(store.lease, "queue_requests", min(max(1, req.limit), 100), LEASE_SECONDS, True)
+  return lease_response(messages)
 
 
 @app.post("/v1/queue/requests/ack")
@@ -450,10 +491,10 @@ async def publish_results(req: PublishMessagesRequest, authorization: Optional[s
 
 
 @app.post("/v1/queue/results/lease", response_model=LeaseResponse)
-async def lease_results(req: LeaseRequest, authorization: Optional[str] = Header(default=None)) -> LeaseResponse:
+async def lease_results(req: LeaseRequest, authorization: Optional[str] = Header(default=None)) -> Response:
   require_token(authorization)
-  messages = await asyncio.to_thread(store.lease, "queue_results", min(max(1, req.limit), 100), LEASE_SECONDS)
-  return LeaseResponse(messages=messages)
+  messages = await asyncio.to_thread(store.lease, "queue_results", min(max(1, req.limit), 100), LEASE_SECONDS, True)
+  return lease_response(messages)
 
 
 @app.post("/v1/queue/results/ack")
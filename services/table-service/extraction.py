@@ -0,0 +1,192 @@
+"""Table extraction, kept free of import side effects so pool processes can import it cheaply."""
+import concurrent.futures
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import orjson
+
+try:
+  import pdfplumber  # type: ignore
+  _PDFPLUMBER_IMPORT_ERROR: Optional[Exception] = None
+except Exception as exc:  # pragma: no cover - reported by ensure_pdfplumber_available / run_table_extraction
+  pdfplumber = None
+  _PDFPLUMBER_IMPORT_ERROR = exc
+
+
+OUTPUT_DIR = os.getenv("OUTPUT_EXTRACTED_DIR", "data/extracted")
+ENABLE_OCR_FALLBACK = os.getenv("TABLE_WORKER_ENABLE_OCR_FALLBACK", "0").lower() in {"1", "true", "yes"}
+THOROUGH_EXTRACT = os.getenv("TABLE_WORKER_THOROUGH_EXTRACT", "0").lower() in {"1", "true", "yes"}
+# Opt-in: pdfplumber is CPU-bound and holds the GIL, so page threads inside one pool process mostly add
+# overhead. Documents are already spread across TABLE_WORKER_CONCURRENCY processes.
+PAGE_CONCURRENCY = max(1, int(os.getenv("TABLE_WORKER_PAGE_CONCURRENCY", "1")))
+
+
+def utc_now_iso() -> str:
+  return to_utc_iso(datetime.now(timezone.utc))
+
+
+def to_utc_iso(value: datetime) -> str:
+  return value.isoformat().replace("+00:00", "Z")
+
+
+def run_table_extraction(doc_id: str, raw_pdf_path: str) -> Dict[str, Any]:
+  if not raw_pdf_path or not Path(raw_pdf_path).exists():
+    return {
+      "status": "failed",
+      "errorCode": "file_not_found",
+      "error": f"raw pdf not found: {raw_pdf_path}",
+      "tableCount": 0,
+      "tablesLocation": None,
+      "engine": "pdfplumber",
+    }
+
+  if _PDFPLUMBER_IMPORT_ERROR is not None:
+    return {
+      "status": "failed",
+      "errorCode": "dependency_missing",
+      "error": "pdfplumber_not_installed",
+      "tableCount": 0,
+      "tablesLocation": None,
+      "engine": "pdfplumber",
+    }
+
+  output_path = str(Path(OUTPUT_DIR) / f"{doc_id}.tables.json")
+
+  partial_path = Path(f"{output_path}.partial")
+
+  try:
+    with pdfplumber.open(raw_pdf_path) as pdf:
+      page_count = len(pdf.pages)
+
+    # Pages are streamed to disk as their range finishes, so the full document is never held as one string.
+    table_count = 0
+    written_pages = 0
+    partial_path.parent.mkdir(parents=True, exist_ok=True)
+    try:
+      with partial_path.open("wb") as output:
+        output.write(b'{"docId":' + orjson.dumps(doc_id) + b',"pages":[')
+        for page_payload in iter_page_payloads(raw_pdf_path, split_page_ranges(page_count, PAGE_CONCURRENCY)):
+          if written_pages:
+            output.write(b",")
+          output.write(orjson.dumps(page_payload))
+          table_count += page_payload["tableCount"]
+          written_pages += 1
+        trailer = {
+          "status": "ok",
+          "tableCount": table_count,
+          "pageCount": written_pages,
+          "engine": "pdfplumber",
+          "extractedAt": utc_now_iso(),
+        }
+        output.write(b"]," + orjson.dumps(trailer)[1:])
+    except BaseException:
+      partial_path.unlink(missing_ok=True)
+      raise
+
+    if table_count == 0 and ENABLE_OCR_FALLBACK:
+      partial_path.unlink(missing_ok=True)
+      # Placeholder for future OCR table extraction path.
+      # Keep explicit marker for observability when OCR fallback is requested.
+      return {
+        "status": "no_tables",
+        "errorCode": "unknown",
+        "error": "ocr_fallback_requested_but_not_implemented",
+        "tableCount": 0,
+        "tablesLocation": None,
+        "engine": "pdfplumber",
+      }
+
+    os.replace(partial_path, output_path)
+    return {
+      "status": "ok" if table_count > 0 else "no_tables",
+      "errorCode": None,
+      "error": None,
+      "tableCount": table_count,
+      "tablesLocation": output_path,
+      "engine": "pdfplumber",
+    }
+  except PermissionError as exc:
+    return {
+      "status": "failed",
+      "errorCode": "file_access_denied",
+      "error": str(exc),
+      "tableCount": 0,
+      "tablesLocation": None,
+      "engine": "pdfplumber",
+    }
+  except Exception as exc:
+    return {
+      "status": "failed",
+      "errorCode": "parse_error",
+      "error": str(exc),
+      "tableCount": 0,
+      "tablesLocation": None,
+      "engine": "pdfplumber",
+    }
+
+
+def split_page_ranges(page_count: int, max_ranges: int) -> List[Tuple[int, int]]:
+  if page_count <= 0:
+    return []
+  range_size = -(-page_count // min(max_ranges, page_count))
+  return [(first, min(first + range_size - 1, page_count)) for first in range(1, page_count + 1, range_size)]
+
+
+def iter_page_payloads(raw_pdf_path: str, page_ranges: List[Tuple[int, int]]) -> Iterator[Dict[str, Any]]:
+  if len(page_ranges) <= 1:
+    for page_range in page_ranges:
+      yield from extract_page_range(raw_pdf_path, *page_range)
+    return
+
+  # Each thread opens its own handle: pdfplumber pages share per-document parser state.
+  with concurrent.futures.ThreadPoolExecutor(max_workers=len(page_ranges)) as executor:
+    for range_payload in executor.map(lambda page_range: extract_page_range(raw_pdf_path, *page_range), page_ranges):
+      yield from range_payload
+
+
+def extract_page_range(raw_pdf_path: str, first_page: int, last_page: int) -> List[Dict[str, Any]]:
+  pages_payload: List[Dict[str, Any]] = []
+  with pdfplumber.open(raw_pdf_path) as pdf:
+    for page_number in range(first_page, last_page + 1):
+      tables = extract_tables_with_strategies(pdf.pages[page_number - 1])
+      normalized = []
+      for table_index, rows in enumerate(tables):
+        normalized.append(
+          {
+            "index": table_index,
+            "rowCount": len(rows),
+            "rows": rows,
+          }
+        )
+      pages_payload.append(
+        {
+          "pageNumber": page_number,
+          "tableCount": len(tables),
+          "tables": normalized,
+        }
+      )
+  return pages_payload
+
+
+def extract_tables_with_strategies(page: Any) -> List[Any]:
+  strategy_candidates = [
+    # pdfplumber's default settings are the lines/lines strategy.
+    None,
+    {"vertical_strategy": "text", "horizontal_strategy": "text", "snap_tolerance": 3, "join_tolerance": 3, "intersection_tolerance": 3},
+  ]
+  merged: List[Any] = []
+  seen = set()
+  for strategy in strategy_candidates:
+    tables = page.extract_tables(strategy) if strategy is not None else page.extract_tables()
+    for table in tables or []:
+      signature = tuple(tuple(row) for row in table)
+      if signature in seen:
+        continue
+      seen.add(signature)
+      merged.append(table)
+    # Later strategies are progressively more expensive (text layout analysis); stop at the first hit.
+    if merged and not THOROUGH_EXTRACT:
+      break
+  return merged
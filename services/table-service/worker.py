@@ -1,18 +1,26 @@
 #!/usr/bin/env python3
-import hashlib
 import json
 import os
 import sqlite3
 import time
+import uuid
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
+
+try:
+    import pdfplumber  # type: ignore
+    _PDFPLUMBER_IMPORT_ERROR: Optional[Exception] = None
+except Exception as exc:  # pragma: no cover - reported by main / run_table_extraction
+    pdfplumber = None
+    _PDFPLUMBER_IMPORT_ERROR = exc
 
 
 QUEUE_DB_PATH = os.getenv("ASYNC_QUEUE_PATH", "data/async-queue.sqlite")
 OUTPUT_DIR = os.getenv("OUTPUT_EXTRACTED_DIR", "data/extracted")
 POLL_INTERVAL_MS = int(os.getenv("TABLE_WORKER_POLL_INTERVAL_MS", "1000"))
 MAX_BATCH = int(os.getenv("TABLE_WORKER_MAX_BATCH", "5"))
+SQLITE_MAX_IN_PARAMS = 500
 
 
 def utc_now_iso() -> str:
@@ -26,6 +34,15 @@ def ensure_output_dir() -> None:
 def connect_db() -> sqlite3.Connection:
     conn = sqlite3.connect(QUEUE_DB_PATH)
     conn.row_factory = sqlite3.Row
+    conn.executescript(
+        """
+        PRAGMA journal_mode=WAL;
+        PRAGMA synchronous=NORMAL;
+        PRAGMA busy_timeout=5000;
+        PRAGMA temp_store=MEMORY;
+        PRAGMA mmap_size=268435456;
+        """
+    )
     return conn
 
 
@@ -52,23 +69,25 @@ def lease_requests(conn: sqlite3.Connection, limit: int) -> List[sqlite3.Row]:
     return rows
 
 
-def ack_request(conn: sqlite3.Connection, queue_message_id: str) -> None:
-    conn.execute("DELETE FROM queue_requests WHERE queueMessageId=?", (queue_message_id,))
-    conn.commit()
+def ack_requests(conn: sqlite3.Connection, queue_message_ids: List[str]) -> None:
+    with conn:
+        for start in range(0, len(queue_message_ids), SQLITE_MAX_IN_PARAMS):
+            chunk = queue_message_ids[start:start + SQLITE_MAX_IN_PARAMS]
+            placeholders = ",".join("?" * len(chunk))
+            conn.execute(f"DELETE FROM queue_requests WHERE queueMessageId IN ({placeholders})", chunk)
 
 
 def publish_result(conn: sqlite3.Connection, payload: Dict[str, Any]) -> None:
-    queue_message_id = hashlib.sha256(
-        f"{payload.get('jobId','')}|{payload.get('docId','')}|{utc_now_iso()}".encode("utf-8")
-    ).hexdigest()[:24]
-    conn.execute(
-        """
-        INSERT INTO queue_results(queueMessageId, payload, status, createdAt)
-        VALUES (?, ?, 'pending', ?)
-        """,
-        (queue_message_id, json.dumps(payload), utc_now_iso()),
-    )
-    conn.commit()
+    # Results are never deduplicated: every attempt's result has to reach the orchestrator.
+    queue_message_id = uuid.uuid4().hex[:24]
+    with conn:
+        conn.execute(
+            """
+            INSERT INTO queue_results(queueMessageId, payload, status, createdAt)
+            VALUES (?, ?, 'pending', ?)
+            """,
+            (queue_message_id, json.dumps(payload, separators=(",", ":")), utc_now_iso()),
+        )
 
 
 def run_table_extraction(doc_id: str, raw_pdf_path: str) -> Dict[str, Any]:
@@ -82,9 +101,7 @@ def run_table_extraction(doc_id: str, raw_pdf_path: str) -> Dict[str, Any]:
             "engine": "pdfplumber",
         }
 
-    try:
-        import pdfplumber  # type: ignore
-    except Exception:
+    if _PDFPLUMBER_IMPORT_ERROR is not None:
         return {
             "status": "failed",
             "errorCode": "dependency_missing",
@@ -164,59 +181,66 @@ def process_once(conn: sqlite3.Connection) -> int:
         return 0
 
     for row in requests:
-        queue_message_id = row["queueMessageId"]
         try:
-            message = json.loads(row["payload"])
-            job_id = message["jobId"]
-            doc_id = message["docId"]
-            raw_pdf_path = message["rawPdfPath"]
-            started = time.time()
-            extracted = run_table_extraction(doc_id, raw_pdf_path)
-            duration_ms = int((time.time() - started) * 1000)
-            publish_result(
-                conn,
-                {
-                    "version": "v1",
-                    "type": "tables.extract.result",
-                    "jobId": job_id,
-                    "docId": doc_id,
-                    "status": extracted["status"],
-                    "tablesLocation": extracted["tablesLocation"],
-                    "tableCount": extracted["tableCount"],
-                    "engine": extracted["engine"],
-                    "errorCode": extracted.get("errorCode"),
-                    "error": extracted["error"],
-                    "durationMs": duration_ms,
-                    "finishedAt": utc_now_iso(),
-                },
-            )
-        except Exception as exc:
-            publish_result(
-                conn,
-                {
-                    "version": "v1",
-                    "type": "tables.extract.result",
-                    "jobId": "unknown",
-                    "docId": "unknown",
-                    "status": "failed",
-                    "errorCode": "worker_exception",
-                    "error": f"worker_exception: {exc}",
-                    "finishedAt": utc_now_iso(),
-                },
-            )
+            process_request(conn, row)
         finally:
-            ack_request(conn, queue_message_id)
+            # Ack each row as soon as it is done: lease_requests sets no leaseUntil, so a row
+            # left leased by a crashed worker would never be reclaimed.
+            ack_requests(conn, [row["queueMessageId"]])
     return len(requests)
 
 
-def main() -> None:
-    ensure_output_dir()
+def process_request(conn: sqlite3.Connection, row: sqlite3.Row) -> None:
+    message: Any = None
     try:
-        import pdfplumber  # noqa: F401
+        message = json.loads(row["payload"])
+        job_id = message["jobId"]
+        doc_id = message["docId"]
+        raw_pdf_path = message["rawPdfPath"]
+        started = time.time()
+        extracted = run_table_extraction(doc_id, raw_pdf_path)
+        duration_ms = int((time.time() - started) * 1000)
+        publish_result(
+            conn,
+            {
+                "version": "v1",
+                "type": "tables.extract.result",
+                "jobId": job_id,
+                "docId": doc_id,
+                "status": extracted["status"],
+                "tablesLocation": extracted["tablesLocation"],
+                "tableCount": extracted["tableCount"],
+                "engine": extracted["engine"],
+                "errorCode": extracted.get("errorCode"),
+                "error": extracted["error"],
+                "durationMs": duration_ms,
+                "finishedAt": utc_now_iso(),
+            },
+        )
     except Exception as exc:
+        # Keep the request's identity when it parsed, so the failure can be matched to its job.
+        identity = message if isinstance(message, dict) else {}
+        publish_result(
+            conn,
+            {
+                "version": "v1",
+                "type": "tables.extract.result",
+                "jobId": identity.get("jobId", "unknown"),
+                "docId": identity.get("docId", "unknown"),
+                "status": "failed",
+                "errorCode": "worker_exception",
+                "error": f"worker_exception: {exc}",
+                "finishedAt": utc_now_iso(),
+            },
+        )
+
+
+def main() -> None:
+    ensure_output_dir()
+    if _PDFPLUMBER_IMPORT_ERROR is not None:
         raise RuntimeError(
             "pdfplumber is required for table worker. Install with: pip install -r services/table-service/requirements.txt"
-        ) from exc
+        ) from _PDFPLUMBER_IMPORT_ERROR
     conn = connect_db()
     print(
         json.dumps(
@@ -158,8 +158,13 @@ export class LocalSqliteQueueAdapter implements AsyncTableQueue {
         leaseUntil TEXT NULL
       );
 
-      CREATE INDEX IF NOT EXISTS idx_queue_requests_status ON queue_requests(status);
-      CREATE INDEX IF NOT EXISTS idx_queue_results_status ON queue_results(status);
+      -- Keep in sync with services/table-service/app.py, which shares this database file.
+      DROP INDEX IF EXISTS idx_queue_requests_status;
+      DROP INDEX IF EXISTS idx_queue_results_status;
+      CREATE INDEX IF NOT EXISTS idx_queue_requests_pending ON queue_requests(createdAt) WHERE status = 'pending';
+      CREATE INDEX IF NOT EXISTS idx_queue_results_pending ON queue_results(createdAt) WHERE status = 'pending';
+      CREATE INDEX IF NOT EXISTS idx_queue_requests_leased ON queue_requests(leaseUntil) WHERE status = 'leased';
+      CREATE INDEX IF NOT EXISTS idx_queue_results_leased ON queue_results(leaseUntil) WHERE status = 'leased';
     `);
 
     this.ensureColumn("queue_requests", "leaseUntil", "TEXT NULL");
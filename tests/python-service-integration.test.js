@@ -28,11 +28,11 @@ async function waitForHealth(baseUrl, timeoutMs) {
   throw new Error("python table service did not become healthy in time");
 }
 
-test("python table service processes request and returns categorized file_not_found error", async (t) => {
-  const probe = spawnSync("python", ["-c", "import fastapi,uvicorn,pdfplumber"], { encoding: "utf-8" });
+async function startTableService(t, extraEnv) {
+  const probe = spawnSync("python", ["-c", "import fastapi,uvicorn,pdfplumber,orjson"], { encoding: "utf-8" });
   if (probe.status !== 0) {
     t.skip("python dependencies for table service are not installed");
-    return;
+    return undefined;
   }
 
   const tempDir = fs.mkdtempSync(path.join(os.tmpdir(), "osgf-pyservice-"));
@@ -50,8 +50,8 @@ test("python table service processes request and returns categorized file_not_fo
         ...process.env,
         ASYNC_QUEUE_PATH: queueDbPath,
         OUTPUT_EXTRACTED_DIR: extractedDir,
-        TABLE_SERVICE_ENABLE_WORKER: "1",
         TABLE_WORKER_POLL_INTERVAL_MS: "100",
+        ...extraEnv,
       },
       stdio: ["ignore", "pipe", "pipe"],
     },
@@ -62,9 +62,43 @@ test("python table service processes request and returns categorized file_not_fo
     stderr += String(chunk);
   });
 
+  const stop = async () => {
+    if (child.exitCode === null) {
+      child.kill();
+      await new Promise((resolve) => child.once("exit", resolve));
+    }
+    if (stderr.includes("Traceback")) {
+      throw new Error(`python service stderr:\n${stderr}`);
+    }
+  };
+
   try {
     await waitForHealth(baseUrl, 20_000);
+  } catch (error) {
+    await stop();
+    throw error;
+  }
+  return { baseUrl, tempDir, stop };
+}
+
+async function postJson(baseUrl, route, body) {
+  const response = await fetch(`${baseUrl}${route}`, {
+    method: "POST",
+    headers: { "content-type": "application/json" },
+    body: JSON.stringify(body),
+  });
+  assert.equal(response.status, 200);
+  return response.json();
+}
 
+test("python table service processes request and returns categorized file_not_found error", async (t) => {
+  const service = await startTableService(t, { TABLE_SERVICE_ENABLE_WORKER: "1" });
+  if (!service) {
+    return;
+  }
+  const { baseUrl, tempDir } = service;
+
+  try {
     const requestBody = {
       messages: [
         {
@@ -80,22 +114,12 @@ test("python table service processes request and returns categorized file_not_fo
       ],
     };
 
-    const publishResponse = await fetch(`${baseUrl}/v1/queue/requests`, {
-      method: "POST",
-      headers: { "content-type": "application/json" },
-      body: JSON.stringify(requestBody),
-    });
-    assert.equal(publishResponse.status, 200);
+    const publishBody = await postJson(baseUrl, "/v1/queue/requests", requestBody);
+    assert.equal(publishBody.accepted, 1);
 
     let resultMessage;
     for (let i = 0; i < 50; i += 1) {
-      const leaseResponse = await fetch(`${baseUrl}/v1/queue/results/lease`, {
-        method: "POST",
-        headers: { "content-type": "application/json" },
-        body: JSON.stringify({ limit: 10 }),
-      });
-      assert.equal(leaseResponse.status, 200);
-      const leaseBody = await leaseResponse.json();
+      const leaseBody = await postJson(baseUrl, "/v1/queue/results/lease", { limit: 10 });
       const messages = leaseBody.messages ?? [];
       const match = messages.find((m) => m.payload?.jobId === "job-integ-1");
       if (match) {
@@ -109,12 +133,78 @@ test("python table service processes request and returns categorized file_not_fo
     assert.equal(resultMessage.payload.status, "failed");
     assert.equal(resultMessage.payload.errorCode, "file_not_found");
   } finally {
-    if (child.exitCode === null) {
-      child.kill();
-      await new Promise((resolve) => child.once("exit", resolve));
-    }
-    if (stderr.includes("Traceback")) {
-      throw new Error(`python service stderr:\n${stderr}`);
-    }
+    await service.stop();
+  }
+});
+
+test("python table service ignores duplicate publishes of a queued request attempt", async (t) => {
+  const service = await startTableService(t, { TABLE_SERVICE_ENABLE_WORKER: "0" });
+  if (!service) {
+    return;
+  }
+  const { baseUrl } = service;
+
+  try {
+    const request = {
+      version: "v1",
+      type: "tables.extract.request",
+      jobId: "job-dup-1",
+      runId: "run-dup-1",
+      docId: "doc-dup-1",
+      rawPdfPath: "/nonexistent.pdf",
+      attempt: 1,
+      submittedAt: "2026-02-20T00:00:00.000Z",
+    };
+
+    assert.equal((await postJson(baseUrl, "/v1/queue/requests", { messages: [request] })).accepted, 1);
+    assert.equal((await postJson(baseUrl, "/v1/queue/requests", { messages: [request] })).accepted, 0);
+    assert.equal((await postJson(baseUrl, "/v1/queue/requests", { messages: [request, request] })).accepted, 0);
+
+    const leaseBody = await postJson(baseUrl, "/v1/queue/requests/lease", { limit: 10 });
+    assert.equal(leaseBody.messages.filter((m) => m.payload?.jobId === "job-dup-1").length, 1);
+
+    // A retry is a new attempt of the same job and must be queued again.
+    assert.equal((await postJson(baseUrl, "/v1/queue/requests", { messages: [{ ...request, attempt: 2 }] })).accepted, 1);
+
+    // Results are never deduplicated, so every attempt's outcome reaches the orchestrator.
+    const result = { version: "v1", type: "tables.extract.result", jobId: "job-dup-1", docId: "doc-dup-1", status: "failed" };
+    assert.equal((await postJson(baseUrl, "/v1/queue/results", { messages: [{ ...result, attempt: 1 }] })).accepted, 1);
+    assert.equal((await postJson(baseUrl, "/v1/queue/results", { messages: [{ ...result, attempt: 2 }] })).accepted, 1);
+    const resultLease = await postJson(baseUrl, "/v1/queue/results/lease", { limit: 10 });
+    assert.deepEqual(
+      resultLease.messages.filter((m) => m.payload?.jobId === "job-dup-1").map((m) => m.payload.attempt),
+      [1, 2],
+    );
+  } finally {
+    await service.stop();
+  }
+});
+
+test("python table service accepts payloads with integers beyond 64 bits", async (t) => {
+  const service = await startTableService(t, { TABLE_SERVICE_ENABLE_WORKER: "0" });
+  if (!service) {
+    return;
+  }
+  const { baseUrl } = service;
+
+  try {
+    // JSON.stringify cannot produce this literal, so the body is written by hand.
+    const response = await fetch(`${baseUrl}/v1/queue/requests`, {
+      method: "POST",
+      headers: { "content-type": "application/json" },
+      body: '{"messages":[{"jobId":"job-bigint-1","docId":"doc-bigint-1","sizeBytes":1180591620717411303424}]}',
+    });
+    assert.equal(response.status, 200);
+    assert.equal((await response.json()).accepted, 1);
+
+    const leaseResponse = await fetch(`${baseUrl}/v1/queue/requests/lease`, {
+      method: "POST",
+      headers: { "content-type": "application/json" },
+      body: JSON.stringify({ limit: 10 }),
+    });
+    assert.equal(leaseResponse.status, 200);
+    assert.match(await leaseResponse.text(), /"sizeBytes":1180591620717411303424\b/);
+  } finally {
+    await service.stop();
   }
 });
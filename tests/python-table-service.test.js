@@ -0,0 +1,154 @@
+const test = require("node:test");
+const assert = require("node:assert/strict");
+const { spawnSync } = require("node:child_process");
+const fs = require("node:fs");
+const os = require("node:os");
+const path = require("node:path");
+
+const SERVICE_DIR = path.resolve("services/table-service");
+
+function runPython(t, modules, code, extraEnv = {}) {
+  const probe = spawnSync("python", ["-c", `import ${modules.join(",")}`], { encoding: "utf-8" });
+  if (probe.status !== 0) {
+    t.skip("python dependencies for table service are not installed");
+    return undefined;
+  }
+
+  const tempDir = fs.mkdtempSync(path.join(os.tmpdir(), "osgf-pytable-"));
+  const child = spawnSync("python", ["-c", code], {
+    cwd: tempDir,
+    encoding: "utf-8",
+    env: {
+      ...process.env,
+      PYTHONPATH: SERVICE_DIR,
+      ASYNC_QUEUE_PATH: path.join(tempDir, "queue.sqlite"),
+      OUTPUT_EXTRACTED_DIR: path.join(tempDir, "extracted"),
+      ...extraEnv,
+    },
+  });
+  assert.equal(child.status, 0, child.stderr);
+  return JSON.parse(child.stdout);
+}
+
+// Minimal PDF with one ruled 3x3 table per page, so pdfplumber's default (lines) strategy finds it.
+function writeTablePdf(filePath, pageCount) {
+  const xs = [50, 150, 250, 350];
+  const ys = [700, 680, 660, 640];
+  const objects = [
+    "<< /Type /Catalog /Pages 2 0 R >>",
+    `<< /Type /Pages /Kids [${Array.from({ length: pageCount }, (_, i) => `${4 + 2 * i} 0 R`).join(" ")}] /Count ${pageCount} >>`,
+    "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+  ];
+  for (let page = 1; page <= pageCount; page += 1) {
+    const ops = ["0.5 w"];
+    for (const y of ys) ops.push(`${xs[0]} ${y} m ${xs[xs.length - 1]} ${y} l S`);
+    for (const x of xs) ops.push(`${x} ${ys[0]} m ${x} ${ys[ys.length - 1]} l S`);
+    ops.push("BT /F1 10 Tf");
+    for (let row = 0; row < 3; row += 1) {
+      for (let col = 0; col < 3; col += 1) {
+        ops.push(`1 0 0 1 ${xs[col] + 5} ${ys[row] - 15} Tm (P${page}R${row}C${col}) Tj`);
+      }
+    }
+    ops.push("ET");
+    const content = ops.join("\n");
+    objects.push(
+      `<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Resources << /Font << /F1 3 0 R >> >> /Contents ${5 + 2 * (page - 1)} 0 R >>`,
+      `<< /Length ${content.length} >>\nstream\n${content}\nendstream`,
+    );
+  }
+
+  let pdf = "%PDF-1.4\n";
+  const offsets = objects.map((object, index) => {
+    const offset = pdf.length;
+    pdf += `${index + 1} 0 obj\n${object}\nendobj\n`;
+    return offset;
+  });
+  const xrefOffset = pdf.length;
+  pdf += `xref\n0 ${objects.length + 1}\n0000000000 65535 f \n`;
+  pdf += offsets.map((offset) => `${String(offset).padStart(10, "0")} 00000 n \n`).join("");
+  pdf += `trailer\n<< /Size ${objects.length + 1} /Root 1 0 R >>\nstartxref\n${xrefOffset}\n%%EOF\n`;
+  fs.writeFileSync(filePath, pdf, "latin1");
+}
+
+test("python queue store publishes and acks batches larger than one statement", (t) => {
+  const result = runPython(
+    t,
+    ["fastapi", "pdfplumber", "orjson"],
+    `
+import json, sqlite3
+import app
+requests = [{"jobId": f"job-{i}", "runId": "run-1", "attempt": 1} for i in range(700)]
+inserted = app.store.publish("queue_requests", requests)
+republished = app.store.publish("queue_requests", requests)
+results = app.store.publish("queue_results", [{"jobId": "job-0", "status": "ok"}] * 700)
+leased = app.store.lease("queue_requests", 1000, 60)
+acked = app.store.ack("queue_requests", [message["queueMessageId"] for message in leased[:600]])
+conn = sqlite3.connect(app.QUEUE_DB_PATH)
+remaining = conn.execute("SELECT COUNT(*) FROM queue_requests").fetchone()[0]
+print(json.dumps({"inserted": inserted, "republished": republished, "results": results, "leased": len(leased), "acked": acked, "remaining": remaining}))
+`,
+    { TABLE_SERVICE_ENABLE_WORKER: "0" },
+  );
+  if (!result) {
+    return;
+  }
+
+  assert.deepEqual(result, { inserted: 700, republished: 0, results: 700, leased: 700, acked: 600, remaining: 100 });
+});
+
+test("python split_page_ranges handles empty and short documents", (t) => {
+  const result = runPython(
+    t,
+    ["pdfplumber", "orjson"],
+    `
+import json
+from extraction import split_page_ranges
+print(json.dumps([split_page_ranges(0, 4), split_page_ranges(3, 4), split_page_ranges(10, 4), split_page_ranges(5, 1)]))
+`,
+  );
+  if (!result) {
+    return;
+  }
+
+  assert.deepEqual(result, [
+    [],
+    [[1, 1], [2, 2], [3, 3]],
+    [[1, 3], [4, 6], [7, 9], [10, 10]],
+    [[1, 5]],
+  ]);
+});
+
+test("python table extraction streams a complete tables.json document", (t) => {
+  const pdfDir = fs.mkdtempSync(path.join(os.tmpdir(), "osgf-pytable-pdf-"));
+  const pdfPath = path.join(pdfDir, "three-pages.pdf");
+  writeTablePdf(pdfPath, 3);
+
+  const result = runPython(
+    t,
+    ["pdfplumber", "orjson"],
+    `
+import json
+from extraction import run_table_extraction
+print(json.dumps(run_table_extraction("doc-stream-1", ${JSON.stringify(pdfPath)})))
+`,
+    { TABLE_WORKER_PAGE_CONCURRENCY: "2" },
+  );
+  if (!result) {
+    return;
+  }
+
+  assert.equal(result.status, "ok");
+  assert.equal(result.tableCount, 3);
+  assert.equal(fs.existsSync(`${result.tablesLocation}.partial`), false);
+
+  const document = JSON.parse(fs.readFileSync(result.tablesLocation, "utf-8"));
+  assert.equal(document.docId, "doc-stream-1");
+  assert.equal(document.status, "ok");
+  assert.equal(document.pageCount, 3);
+  assert.equal(document.tableCount, 3);
+  assert.deepEqual(
+    document.pages.map((page) => page.pageNumber),
+    [1, 2, 3],
+  );
+  assert.deepEqual(document.pages[2].tables[0].rows[0], ["P3R0C0", "P3R0C1", "P3R0C2"]);
+});